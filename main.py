@@ -13,12 +13,20 @@ CHANGELOG v1.1.2:
 
 import pandas as pd
 import numpy as np
+import bottleneck as bn
+from numba import njit
 import yfinance as yf
 import pandas_datareader.data as web
 import requests
 import io
-import matplotlib.pyplot as plt
-import json
+import orjson
+import hashlib
+import os
+import sys
+import time
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import warnings
 
@@ -31,6 +39,9 @@ print("=" * 60)
 # =============================================================================
 # FUNZIONE DI SUPPORTO PER YAHOO FIX
 # =============================================================================
+# yf.download usa uno stato globale condiviso: una sola richiesta Yahoo alla volta
+_yahoo_lock = threading.Lock()
+
 def clean_yahoo_cols(df):
     """
     Risolve il bug del MultiIndex di yfinance.
@@ -40,70 +51,231 @@ def clean_yahoo_cols(df):
         df.columns = df.columns.get_level_values(0)
     return df
 
+# =============================================================================
+# FUNZIONE DI SUPPORTO PER RICAMPIONAMENTO MENSILE
+# =============================================================================
+def ultimo_del_mese(serie):
+    """
+    Equivalente di serie.resample('ME').last() per serie ordinate:
+    prende l'ultima riga valida di ogni mese con una maschera NumPy,
+    senza passare dal resampler di pandas.
+    """
+    serie = serie.dropna()
+    idx = serie.index
+    ym = idx.year * 12 + idx.month
+    mask = np.r_[ym[1:] != ym[:-1], True]
+    return pd.Series(serie.to_numpy()[mask], index=idx[mask].normalize() + pd.offsets.MonthEnd(0),
+                     name=serie.name)
+
+# =============================================================================
+# FUNZIONE DI SUPPORTO PER CACHE SU DISCO
+# =============================================================================
+CACHE_DIR = '.cache'
+CACHE_TTL = 86400  # 1 giorno: i dati sono mensili, inutile riscaricarli
+
+# Le cache contengono dati già elaborati: una modifica al codice (parsing date,
+# ricampionamento...) deve invalidarle, quindi ogni file porta l'hash del sorgente
+with open(__file__, 'rb') as f:
+    HASH_CODICE = hashlib.md5(f.read()).hexdigest()
+
+def leggi_cache(path, ttl):
+    """
+    Restituisce il DataFrame in cache se è più giovane di ttl ed è stato scritto
+    da questa versione di main.py. File mancanti, vecchi o illeggibili: None.
+    """
+    sig = path + '.sig'
+    if not (os.path.exists(path) and os.path.exists(sig)):
+        return None
+    if time.time() - os.path.getmtime(path) >= ttl:
+        return None
+    try:
+        with open(sig, encoding='utf-8') as f:
+            if f.read() != HASH_CODICE:
+                return None
+        return pd.read_parquet(path)
+    except Exception:
+        return None  # file corrotto o troncato: come se la cache non ci fosse
+
+def scrivi_cache(df, path):
+    """Scrive parquet e firma su file temporanei e poi li sposta: mai file a metà."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    df.to_parquet(path + '.tmp')
+    os.replace(path + '.tmp', path)
+    with open(path + '.sig.tmp', 'w', encoding='utf-8') as f:
+        f.write(HASH_CODICE)
+    os.replace(path + '.sig.tmp', path + '.sig')
+
+def cache_su_disco(fonte):
+    """
+    Salva la serie restituita dalla funzione in .cache/{fonte}.parquet.
+    Se il file è più giovane di CACHE_TTL e il codice non è cambiato, salta la rete.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper():
+            path = os.path.join(CACHE_DIR, f"{fonte}.parquet")
+            cache = leggi_cache(path, CACHE_TTL)
+            if cache is not None:
+                serie = cache.iloc[:, 0]
+                print(f"      ✓ {fonte}: {len(serie)} mesi dalla cache")
+                return serie
+            serie = func()
+            scrivi_cache(serie.rename(fonte).to_frame(), path)
+            return serie
+        return wrapper
+    return decorator
+
+DF_CACHE_PATH = os.path.join(CACHE_DIR, 'df.parquet')
+DF_CACHE_TTL = 43200  # 12 ore: l'ultimo mese cambia a ogni chiusura giornaliera
+
+# =============================================================================
+# KERNEL NUMBA PER INDICATORI (PERCENTILI STORICI + CRASHMETER)
+# =============================================================================
+@njit(cache=True)
+def _inserisci_e_rank(buf, size, v):
+    """
+    Inserisce v nel buffer ordinato buf[:size] e restituisce il suo
+    percentile sui size+1 valori, con rank medio sui pareggi come
+    Series.rank(pct=True).
+    """
+    lo = np.searchsorted(buf[:size], v, side='left')
+    hi = np.searchsorted(buf[:size], v, side='right')
+    buf[hi + 1:size + 1] = buf[hi:size].copy()
+    buf[hi] = v
+    return (lo + (hi - lo + 2) / 2.0) / (size + 1)
+
+@njit(cache=True)
+def calcola_indicatori(price, us10y, cape, min_p=120, sma_n=10):
+    """
+    Tutti gli indicatori delle sezioni 3-4 in un solo passaggio sui dati.
+    I percentili equivalgono a expanding(min_periods=min_p).rank(pct=True):
+    un buffer ordinato per serie, aggiornato con searchsorted + inserimento.
+    """
+    n = len(price)
+    ecy = np.empty(n)
+    sma10 = np.full(n, np.nan)
+    extension = np.full(n, np.nan)
+    val_risk = np.full(n, np.nan)
+    ext_risk = np.full(n, np.nan)
+    trend_bull = np.zeros(n, dtype=np.uint8)  # flag 0/1: un byte basta
+    base_risk = np.full(n, np.nan)
+    crash = np.full(n, np.nan)
+
+    buf_val = np.empty(n)
+    buf_ext = np.empty(n)
+    n_ext = 0
+    somma = 0.0
+
+    for i in range(n):
+        # A. VALUATION RISK (Excess CAPE Yield)
+        ecy[i] = 1.0 / cape[i] - us10y[i]
+        r = _inserisci_e_rank(buf_val, i, -ecy[i])
+        if i + 1 >= min_p:
+            val_risk[i] = r
+
+        # B. EXTENSION RISK (SMA10 con somma mobile)
+        somma += price[i]
+        if i >= sma_n:
+            somma -= price[i - sma_n]
+        if i < sma_n - 1:
+            continue
+        sma10[i] = somma / sma_n
+        extension[i] = price[i] / sma10[i] - 1.0
+        r = _inserisci_e_rank(buf_ext, n_ext, extension[i])
+        n_ext += 1
+        if n_ext >= min_p:
+            ext_risk[i] = r
+
+        # C. TREND FILTER
+        trend_bull[i] = price[i] > sma10[i]
+
+        # D. CRASHMETER HARDCORE: floor a 80 col trend ribassista
+        b = 0.60 * val_risk[i] + 0.40 * ext_risk[i]
+        if not np.isnan(b):
+            b = min(max(b, 0.0), 1.0)
+        base_risk[i] = b
+        raw_score = b * 100.0
+        if trend_bull[i]:
+            crash[i] = raw_score
+        elif raw_score + 10.0 > 80.0:
+            crash[i] = raw_score + 10.0
+        else:
+            # anche con Base_Risk NaN, come il vecchio max(80, ...)
+            crash[i] = 80.0
+
+    return ecy, sma10, extension, val_risk, ext_risk, trend_bull, base_risk, crash
+
 # =============================================================================
 # 1. SCARICAMENTO DATI CON GESTIONE ERRORI ROBUSTA
 # =============================================================================
 
+@cache_su_disco('shiller_cape')
 def get_shiller_cape():
     """Scarica CAPE da Yale (Shiller)"""
     url = "http://www.econ.yale.edu/~shiller/data/ie_data.xls"
     headers = {"User-Agent": "Mozilla/5.0"}
     
-    print("\n[1/3] Scarico dati Shiller CAPE...")
     try:
         response = requests.get(url, headers=headers, timeout=10)
-        df = pd.read_excel(io.BytesIO(response.content), sheet_name="Data", header=7)
+        df = pd.read_excel(io.BytesIO(response.content), sheet_name="Data", header=7,
+                           usecols=['Date', 'CAPE'])
         
-        # Parsing date robusto - ALLINEATO A FINE MESE
-        df['Date'] = df['Date'].astype(str).str.replace('.', '', regex=False)
-        df = df[df['Date'].str.len() >= 6]
-        df['Date'] = pd.to_datetime(df['Date'].str[:6], format='%Y%m') + pd.offsets.MonthEnd(0)
-        df.set_index('Date', inplace=True)
+        # Parsing date numerico (YYYY.MM) - ALLINEATO A FINE MESE
+        # Nota: Excel salva ottobre come 1871.1, per questo niente parsing da stringa
+        v = pd.to_numeric(df['Date'], errors='coerce').to_numpy()
+        valide = ~np.isnan(v)
+        v = v[valide]
+        anno = v.astype(np.int32)
+        mese = np.rint((v - anno) * 100).astype(np.int32)
+        date = pd.to_datetime(pd.DataFrame({'year': anno, 'month': mese, 'day': 1}))
+        date = pd.DatetimeIndex(date, name='Date') + pd.offsets.MonthEnd(0)
         
-        cape = pd.to_numeric(df['CAPE'], errors='coerce').dropna()
-        print(f"      ✓ {len(cape)} mesi di dati CAPE (da {cape.index[0].year})")
+        cape = pd.to_numeric(df['CAPE'], errors='coerce').to_numpy()[valide]
+        cape = pd.Series(cape, index=date, name='CAPE').dropna()
+        print(f"      ✓ Shiller CAPE: {len(cape)} mesi (da {cape.index[0].year})")
         return cape
         
     except Exception as e:
-        print(f"      ✗ ERRORE: {e}")
+        print(f"      ✗ Shiller CAPE, ERRORE: {e}")
         raise
 
+@cache_su_disco('yahoo_gspc')
 def get_market_price():
     """Scarica S&P 500 da Yahoo"""
-    print("\n[2/3] Scarico prezzi S&P 500 (^GSPC)...")
     try:
         # Scarica raw e pulisce le colonne
-        raw = yf.download('^GSPC', period='max', progress=False)
+        with _yahoo_lock:
+            raw = yf.download('^GSPC', period='max', progress=False)
         raw = clean_yahoo_cols(raw) # FIX v1.1.2
         
         price = raw['Adj Close']
-        price_monthly = price.resample('ME').last()
-        print(f"      ✓ {len(price_monthly)} mesi di prezzi")
+        price_monthly = ultimo_del_mese(price)
+        print(f"      ✓ S&P 500: {len(price_monthly)} mesi di prezzi")
         return price_monthly
     except Exception as e:
-        print(f"      ✗ ERRORE: {e}")
+        print(f"      ✗ S&P 500, ERRORE: {e}")
         raise
 
+@cache_su_disco('us10y')
 def get_rates_robust():
     """Scarica tassi US 10Y (FRED → Yahoo → Fallback)"""
-    print("\n[3/3] Scarico tassi US 10Y...")
-    
     # Tentativo 1: FRED
     try:
         rates = web.DataReader('GS10', 'fred', '1950-01-01')['GS10'] / 100
-        rates = rates.resample('ME').last()
-        print(f"      ✓ {len(rates)} mesi da FRED")
+        rates = ultimo_del_mese(rates)
+        print(f"      ✓ US 10Y: {len(rates)} mesi da FRED")
         return rates
     except Exception as e:
-        print(f"      ⚠ FRED fallito, provo Yahoo ^TNX...")
+        print(f"      ⚠ US 10Y: FRED fallito, provo Yahoo ^TNX...")
     
     # Tentativo 2: Yahoo
     try:
-        raw_tnx = yf.download('^TNX', period='max', progress=False)
+        with _yahoo_lock:
+            raw_tnx = yf.download('^TNX', period='max', progress=False)
         raw_tnx = clean_yahoo_cols(raw_tnx) # FIX v1.1.2
         
         tnx = raw_tnx['Adj Close']
-        tnx_monthly = tnx.resample('ME').last()
+        tnx_monthly = ultimo_del_mese(tnx)
         
         ultimo_valore = tnx_monthly.iloc[-1]
         
@@ -114,22 +286,39 @@ def get_rates_robust():
         else:
             rates = tnx_monthly # Decimale
             
-        print(f"      ✓ {len(rates)} mesi da Yahoo")
+        print(f"      ✓ US 10Y: {len(rates)} mesi da Yahoo")
         return rates
     except Exception as e:
-        print(f"      ✗ ERRORE CRITICO: {e}")
+        print(f"      ✗ US 10Y, ERRORE CRITICO: {e}")
         raise
 
 # =============================================================================
 # 2. MERGE E VALIDAZIONE DATI
 # =============================================================================
 
-cape = get_shiller_cape()
-price = get_market_price()
-rates = get_rates_robust()
-
-df = pd.concat([price, rates, cape], axis=1).dropna()
-df.columns = ['Price', 'US10Y', 'CAPE']
+# Dataset unito dell'ultimo run ancora valido: salta download e merge
+df = leggi_cache(DF_CACHE_PATH, DF_CACHE_TTL)
+if df is not None:
+    print("\n      ✓ Dataset unito dalla cache")
+else:
+    # Le tre fonti sono indipendenti e quasi solo attesa di rete: in parallelo.
+    # Le righe di log arrivano in ordine di completamento, ognuna col suo nome
+    print("\nScarico Shiller CAPE, S&P 500 (^GSPC) e tassi US 10Y in parallelo...")
+    with ThreadPoolExecutor(3) as ex:
+        f_cape = ex.submit(get_shiller_cape)
+        f_price = ex.submit(get_market_price)
+        f_rates = ex.submit(get_rates_robust)
+        cape, price, rates = f_cape.result(), f_price.result(), f_rates.result()
+
+    # Inner join diretto sugli indici di fine mese (le serie arrivano già senza NaN)
+    idx = price.index.intersection(rates.index).intersection(cape.index)
+    df = pd.DataFrame({
+        'Price': price.reindex(idx).to_numpy(),
+        'US10Y': rates.reindex(idx).to_numpy(),
+        'CAPE': cape.reindex(idx).to_numpy(),
+    }, index=idx)
+
+    scrivi_cache(df, DF_CACHE_PATH)
 
 print(f"\n{'='*60}")
 print(f"Dataset finale: {len(df)} mesi ({df.index[0].strftime('%Y-%m')} → {df.index[-1].strftime('%Y-%m')})")
@@ -145,24 +334,24 @@ if len(df) < 120:
 
 print("\nCalcolo indicatori...")
 
-# A. VALUATION RISK (Excess CAPE Yield)
-df['EY'] = 1 / df['CAPE']  # Earnings Yield
-df['ECY'] = df['EY'] - df['US10Y']  # Excess CAPE Yield (Yield Gap)
-df['Valuation_Risk'] = (-df['ECY']).expanding(min_periods=120).rank(pct=True)
-
-# Calcolo VERO percentile CAPE per il JSON
-df['CAPE_Percentile'] = df['CAPE'].expanding(min_periods=120).rank(pct=True)
-
-# B. EXTENSION RISK (Distance from SMA10)
-df['SMA10'] = df['Price'].rolling(10).mean()
-df['Extension'] = df['Price'] / df['SMA10'] - 1
-df['Extension_Risk'] = df['Extension'].expanding(min_periods=120).rank(pct=True)
+# Da qui in poi solo array NumPy (una colonna = un array), il DataFrame
+# viene ricostruito una volta sola alla fine per output e grafico
+arrs = {k: df[k].to_numpy() for k in df.columns}
+colonne = ['ECY', 'SMA10', 'Extension', 'Valuation_Risk', 'Extension_Risk',
+           'Trend_Bull', 'Base_Risk', 'CrashMeter']
+arrs.update(zip(colonne, calcola_indicatori(arrs['Price'], arrs['US10Y'], arrs['CAPE'])))
 
-# C. TREND FILTER
-df['Trend_Bull'] = (df['Price'] > df['SMA10']).astype(int)
+# Calcolo VERO percentile CAPE per il JSON: serve solo l'ultimo mese, quindi
+# basta contare (rank medio sui pareggi, come rank(pct=True)) senza storia
+cape_storico = arrs['CAPE']
+cape_ultimo = cape_storico[-1]
+cape_percentile = (np.sum(cape_storico < cape_ultimo)
+                   + (np.sum(cape_storico == cape_ultimo) + 1) / 2) / len(cape_storico)
 
 # Drop righe senza SMA10 (prime 9 osservazioni)
-df = df.dropna(subset=['SMA10'])
+valide = ~np.isnan(arrs['SMA10'])
+arrs = {k: v[valide] for k, v in arrs.items()}
+date = df.index[valide]
 
 # =============================================================================
 # 4. CRASHMETER HARDCORE
@@ -170,18 +359,9 @@ df = df.dropna(subset=['SMA10'])
 
 print("Applicazione logica HARDCORE (floor a 80)...\n")
 
-df['Base_Risk'] = df['Valuation_Risk'] * 0.60 + df['Extension_Risk'] * 0.40
-df['Base_Risk'] = df['Base_Risk'].clip(0, 1)
+arrs['CrashMeter_Smooth'] = bn.move_mean(arrs['CrashMeter'], 3, min_count=1)
 
-def asilo_crashmeter_hardcore(row):
-    raw_score = row['Base_Risk'] * 100
-    if row['Trend_Bull'] == 1:
-        return raw_score
-    else:
-        return max(80.0, raw_score + 10)
-
-df['CrashMeter'] = df.apply(asilo_crashmeter_hardcore, axis=1)
-df['CrashMeter_Smooth'] = df['CrashMeter'].rolling(3, min_periods=1).mean()
+df = pd.DataFrame(arrs, index=date)
 
 # =============================================================================
 # 5. OUTPUT E RISULTATI
@@ -190,15 +370,16 @@ df['CrashMeter_Smooth'] = df['CrashMeter'].rolling(3, min_periods=1).mean()
 last = df.iloc[-1]
 score = last['CrashMeter_Smooth']
 
-if score > 80:
-    zona = "🔴 ZONA ROSSA ESTREMA"
-    azione = "Proteggere il capitale. Ridurre esposizione azionaria."
-elif score > 50:
-    zona = "🟡 ZONA GIALLA (CAUTELA)"
-    azione = "Accumulo graduale solo su debolezze significative."
-else:
-    zona = "🟢 ZONA VERDE"
-    azione = "Ok sovrappesare azioni per il lungo periodo."
+# (etichetta, zona JSON, azione, colore, emoji) - soglie: > 50 gialla, > 80 rossa
+ZONE = [
+    ("🟢 ZONA VERDE", "VERDE",
+     "Ok sovrappesare azioni per il lungo periodo.", "#388e3c", "🟢"),
+    ("🟡 ZONA GIALLA (CAUTELA)", "GIALLA",
+     "Accumulo graduale solo su debolezze significative.", "#fbc02d", "🟡"),
+    ("🔴 ZONA ROSSA ESTREMA", "ROSSA",
+     "Proteggere il capitale. Ridurre esposizione azionaria.", "#d32f2f", "🔴"),
+]
+zona, zona_json, azione, colore_hex, emoji = ZONE[int(np.searchsorted([50, 80], score))]
 
 print("=" * 60)
 print(f"ASILO FINANZA CRASHMETER - {df.index[-1].strftime('%B %Y').upper()}")
@@ -212,11 +393,11 @@ print(f"🎯 SCORE: {score:.1f}/100 ({zona})")
 json_out = {
     "ultimo_aggiornamento": df.index[-1].strftime("%d %B %Y"),
     "score": round(score, 1),
-    "zona": "ROSSA" if score > 80 else "GIALLA" if score > 50 else "VERDE",
-    "colore_hex": "#d32f2f" if score > 80 else "#fbc02d" if score > 50 else "#388e3c",
-    "emoji": "🔴" if score > 80 else "🟡" if score > 50 else "🟢",
+    "zona": zona_json,
+    "colore_hex": colore_hex,
+    "emoji": emoji,
     "cape_attuale": round(last['CAPE'], 1),
-    "cape_percentile": int(last['CAPE_Percentile'] * 100),
+    "cape_percentile": int(cape_percentile * 100),
     "valuation_risk_percentile": int(last['Valuation_Risk'] * 100),
     "ecy_percent": round(last['ECY'] * 100, 2),
     "distanza_trend_percent": round(last['Extension'] * 100, 1),
@@ -226,23 +407,58 @@ json_out = {
     "versione": "Hardcore 1.1.2"
 }
 
-with open('crashmeter_status.json', 'w', encoding='utf-8') as f:
-    json.dump(json_out, f, ensure_ascii=False, indent=2)
+# orjson scrive direttamente UTF-8 (emoji comprese) e gestisce gli scalari NumPy di df
+with open('crashmeter_status.json', 'wb') as f:
+    f.write(orjson.dumps(json_out, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
 print("✓ JSON salvato")
 
-df[['CrashMeter_Smooth', 'CAPE', 'Extension', 'Trend_Bull']].tail(36).to_csv('crashmeter_history.csv')
+# 36 righe fisse: scritte a mano, senza passare dal CSV writer di pandas
+colonne_csv = ['CrashMeter_Smooth', 'CAPE', 'Extension', 'Trend_Bull']
+tail = df[colonne_csv].tail(36)
+with open('crashmeter_history.csv', 'w', encoding='utf-8') as f:
+    f.write(','.join(['Date'] + colonne_csv) + '\n')
+    for data, *valori in zip(tail.index.strftime('%Y-%m-%d'), *(tail[c].to_numpy() for c in colonne_csv)):
+        f.write(','.join([data] + [str(v) for v in valori]) + '\n')
 print("✓ CSV salvato")
 
 # =============================================================================
 # 7. GRAFICO STORICO
 # =============================================================================
 
+# CRASHMETER_PLOT=0 per aggiornare solo JSON/CSV (es. consumer WordPress)
+if os.getenv('CRASHMETER_PLOT', '1') != '1':
+    print("✓ Grafico disattivato (CRASHMETER_PLOT)")
+    sys.exit(0)
+
+# Se JSON e codice sono identici all'ultimo grafico salvato, il PNG non cambia:
+# salta. Il sorgente entra nell'hash così ogni modifica al disegno lo rigenera
+h = hashlib.md5(orjson.dumps(json_out, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY))
+with open(__file__, 'rb') as f:
+    h.update(f.read())
+hash_grafico = h.hexdigest()
+hash_path = os.path.join(CACHE_DIR, 'last_plot.hash')
+if os.path.exists('crashmeter_grafico.png') and os.path.exists(hash_path):
+    with open(hash_path, encoding='utf-8') as f:
+        if f.read() == hash_grafico:
+            print("✓ PNG invariato, grafico saltato")
+            sys.exit(0)
+
+# Import pesante (font, backend...): solo quando il grafico va davvero fatto
+import matplotlib
+matplotlib.use('Agg')  # nessun backend GUI: si salva solo il PNG
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.patches import Rectangle
+
+cape_mediana = float(np.median(df['CAPE'].to_numpy()))
+
 fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), height_ratios=[2, 1])
 
 # Pannello 1
-ax1.fill_between(df.index, 80, 100, color='#d32f2f', alpha=0.3)
-ax1.fill_between(df.index, 50, 80, color='#fbc02d', alpha=0.3)
-ax1.fill_between(df.index, 0, 50, color='#388e3c', alpha=0.3)
+# Fasce di zona: un rettangolo ciascuna (4 vertici) invece di un poligono per mese
+x0, x1 = mdates.date2num(df.index[0]), mdates.date2num(df.index[-1])
+for lo, hi, colore in [(80, 100, '#d32f2f'), (50, 80, '#fbc02d'), (0, 50, '#388e3c')]:
+    ax1.add_patch(Rectangle((x0, lo), x1 - x0, hi - lo, color=colore, alpha=0.3, zorder=0))
 ax1.plot(df.index, df['CrashMeter_Smooth'], color='darkred', linewidth=2.5)
 ax1.axhline(80, color='red', linestyle='--', alpha=0.5)
 ax1.axhline(50, color='orange', linestyle='--', alpha=0.5)
@@ -254,9 +470,13 @@ ax1.grid(alpha=0.3)
 ax2_cape = ax2.twinx()
 ax2.bar(df.index, df['Trend_Bull'], color='lightblue', alpha=0.3)
 ax2_cape.plot(df.index, df['CAPE'], color='navy', linewidth=1.5)
-ax2_cape.axhline(df['CAPE'].median(), color='gray', linestyle='--', alpha=0.5)
+ax2_cape.axhline(cape_mediana, color='gray', linestyle='--', alpha=0.5)
 ax2.set_ylabel("Trend (Bull=1)", fontweight='bold')
 ax2_cape.set_ylabel("CAPE", fontweight='bold', color='navy')
 plt.tight_layout()
-plt.savefig('crashmeter_grafico.png', dpi=300, bbox_inches='tight')
+plt.savefig('crashmeter_grafico.png', dpi=150, bbox_inches='tight')
 print("✓ PNG salvato")
+
+os.makedirs(CACHE_DIR, exist_ok=True)
+with open(hash_path, 'w', encoding='utf-8') as f:
+    f.write(hash_grafico)